@@ -13,4 +13,11 @@ DB_CONFIG = {
 SCRAPER_CONFIG = {
     "headless": False,  # Set True to run browser in background
     "delay_between_requests": 2,  # seconds
+    "parse_workers": 2,  # processes parsing pages in the background
+    "max_pending_pages": 4,  # pages queued before the browser waits
+    # "postgres", or "sqlite" to buffer locally, then run `main.py sync`.
+    # Upgrading? Rerun `python database/setup.py` first - price writes need
+    # the new price_history (product_id, scraped_at) unique index.
+    "storage": "postgres",
+    "buffer_path": None,  # SQLite buffer file (default: scrape_buffer.db)
 }
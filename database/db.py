@@ -1,5 +1,6 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.errors
+from psycopg2.extras import RealDictCursor, Json, execute_values
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -105,6 +106,88 @@ def save_price(product_id, price_data):
     conn.close()
 
 
+def save_product_page(page):
+    """Save a page of products and their prices in one transaction, return product IDs"""
+    return save_products_batch([{
+        'category_id': page.category_id,
+        'platform_id': page.platform_id,
+        'name': p.name,
+        'url': p.url,
+        'shop_name': p.shop_name,
+        'image_url': p.image_url,
+        'price': p.price,
+        'original_price': p.original_price,
+        'discount_percent': p.discount_percent,
+        'sold': p.sold,
+        'scraped_at': page.scraped_at
+    } for p in page.products])
+
+
+def save_products_batch(rows):
+    """Save product/price rows in one transaction, return product IDs.
+
+    Idempotent: products are keyed on url and prices on (product, scraped_at),
+    so re-sending a batch doesn't duplicate anything.
+    """
+    if not rows:
+        return []
+
+    # Dedupe - ON CONFLICT can't touch the same row twice in one statement
+    products = {r['url']: r for r in rows}
+    prices = {(r['url'], r['scraped_at']): r for r in rows}
+    specs = Json({})
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    result = execute_values(cursor, """
+        INSERT INTO products (category_id, platform_id, name, url, shop_name, image_url, specs)
+        VALUES %s
+        ON CONFLICT (url) DO UPDATE
+        SET name = EXCLUDED.name, shop_name = EXCLUDED.shop_name,
+            image_url = EXCLUDED.image_url, specs = EXCLUDED.specs,
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING id, url
+    """, [(
+        r['category_id'],
+        r['platform_id'],
+        r['name'],
+        r['url'],
+        r['shop_name'],
+        r['image_url'],
+        specs
+    ) for r in products.values()], fetch=True)
+    product_ids = {url: product_id for product_id, url in result}
+
+    try:
+        execute_values(cursor, """
+            INSERT INTO price_history (product_id, price, original_price, discount_percent, sold, scraped_at)
+            VALUES %s
+            ON CONFLICT (product_id, scraped_at) DO NOTHING
+        """, [(
+            product_ids[r['url']],
+            r['price'],
+            r['original_price'],
+            r['discount_percent'],
+            r['sold'],
+            r['scraped_at']
+        ) for r in prices.values()])
+    except psycopg2.errors.InvalidColumnReference as e:
+        # ON CONFLICT needs idx_price_history_product_date
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        raise RuntimeError(
+            "price_history is missing its (product_id, scraped_at) unique index - "
+            "run `python database/setup.py`"
+        ) from e
+
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return list(product_ids.values())
+
+
 def get_price_history(product_id, limit=30):
     """Get price history for a product"""
     conn = get_connection()
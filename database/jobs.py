@@ -0,0 +1,188 @@
+from psycopg2.extras import RealDictCursor
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.db import get_connection, get_category_id, get_platform_id
+
+
+def get_or_create_search_query(keyword, category_slug='ram', platform_name='Shopee'):
+    """Get search query ID for a keyword, creating it if needed"""
+    category_id = get_category_id(category_slug)
+    platform_id = get_platform_id(platform_name)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT id FROM search_queries
+        WHERE keyword = %s AND category_id = %s AND platform_id = %s
+    """, (keyword, category_id, platform_id))
+    existing = cursor.fetchone()
+
+    if existing:
+        query_id = existing[0]
+        cursor.execute("UPDATE search_queries SET is_active = TRUE WHERE id = %s", (query_id,))
+    else:
+        cursor.execute("""
+            INSERT INTO search_queries (category_id, platform_id, keyword)
+            VALUES (%s, %s, %s)
+            RETURNING id
+        """, (category_id, platform_id, keyword))
+        query_id = cursor.fetchone()[0]
+
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return query_id
+
+
+def enqueue_jobs(query_id, max_pages):
+    """Queue one job per page, skipping pages already pending/running. Return count queued."""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        INSERT INTO scrape_jobs (query_id, page)
+        SELECT %s, page FROM generate_series(0, %s - 1) AS page
+        ON CONFLICT (query_id, page) WHERE status IN ('pending', 'running') DO NOTHING
+    """, (query_id, max_pages))
+    count = cursor.rowcount
+
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return count
+
+
+def claim_job(worker_id, lease_seconds=120, max_attempts=3):
+    """Claim the next pending job (or one whose lease expired), return it or None"""
+    conn = get_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+    # Jobs whose worker died on the last allowed attempt can't be reclaimed -
+    # fail them so they don't sit 'running' forever and block re-queueing
+    cursor.execute("""
+        UPDATE scrape_jobs
+        SET status = 'failed', finished_at = NOW(), lease_expires_at = NULL,
+            last_error = COALESCE(last_error, 'lease expired')
+        WHERE status = 'running' AND lease_expires_at < NOW() AND attempts >= %s
+    """, (max_attempts,))
+
+    # SKIP LOCKED lets concurrent workers each grab a different row
+    cursor.execute("""
+        UPDATE scrape_jobs j
+        SET status = 'running', worker_id = %s, attempts = j.attempts + 1,
+            heartbeat_at = NOW(), lease_expires_at = NOW() + %s * INTERVAL '1 second'
+        FROM search_queries q
+        WHERE q.id = j.query_id AND j.id = (
+            SELECT id FROM scrape_jobs
+            WHERE ((status = 'pending' AND (not_before IS NULL OR not_before <= NOW()))
+                   OR (status = 'running' AND lease_expires_at < NOW()))
+              AND attempts < %s
+            ORDER BY id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING j.id, j.page, j.attempts, q.id AS query_id, q.keyword, q.category_id
+    """, (worker_id, lease_seconds, max_attempts))
+    job = cursor.fetchone()
+
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return job
+
+
+def heartbeat_job(job_id, worker_id, lease_seconds=120):
+    """Extend a job's lease, return False if the worker no longer holds it"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        UPDATE scrape_jobs
+        SET heartbeat_at = NOW(), lease_expires_at = NOW() + %s * INTERVAL '1 second'
+        WHERE id = %s AND worker_id = %s AND status = 'running'
+    """, (lease_seconds, job_id, worker_id))
+    held = cursor.rowcount == 1
+
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return held
+
+
+def complete_job(job_id, worker_id):
+    """Mark a job done, return False if the lease was lost to another worker"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        UPDATE scrape_jobs
+        SET status = 'done', finished_at = NOW(), lease_expires_at = NULL
+        WHERE id = %s AND worker_id = %s AND status = 'running'
+        RETURNING query_id
+    """, (job_id, worker_id))
+    result = cursor.fetchone()
+
+    if result:
+        cursor.execute(
+            "UPDATE search_queries SET last_scraped_at = NOW() WHERE id = %s",
+            (result[0],)
+        )
+
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return result is not None
+
+
+def fail_job(job_id, worker_id, error, max_attempts=3, retry_delay=60):
+    """Release a failed job for retry after a backoff, or mark it failed once out of attempts"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    # Wait retry_delay, 2x, 4x... so a flaky page doesn't burn its attempts in seconds
+    cursor.execute("""
+        UPDATE scrape_jobs
+        SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+            last_error = %s, worker_id = NULL, lease_expires_at = NULL,
+            not_before = NOW() + %s * POWER(2, GREATEST(attempts - 1, 0)) * INTERVAL '1 second',
+            finished_at = CASE WHEN attempts >= %s THEN NOW() END
+        WHERE id = %s AND worker_id = %s AND status = 'running'
+    """, (max_attempts, error, retry_delay, max_attempts, job_id, worker_id))
+
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def release_job(job_id, worker_id, error=None):
+    """Put a job back without using up an attempt (e.g. our browser crashed)"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        UPDATE scrape_jobs
+        SET status = 'pending', attempts = GREATEST(attempts - 1, 0),
+            last_error = COALESCE(%s, last_error),
+            worker_id = NULL, lease_expires_at = NULL
+        WHERE id = %s AND worker_id = %s AND status = 'running'
+    """, (error, job_id, worker_id))
+
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def get_job_counts():
+    """Get number of jobs per status"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT status, COUNT(*) FROM scrape_jobs GROUP BY status")
+    results = dict(cursor.fetchall())
+
+    cursor.close()
+    conn.close()
+    return results
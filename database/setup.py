@@ -114,11 +114,42 @@ def create_tables():
         )
     """)
 
+    # Scrape jobs table - (keyword, page) work items claimed by workers
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS scrape_jobs (
+            id SERIAL PRIMARY KEY,
+            query_id INTEGER REFERENCES search_queries(id) ON DELETE CASCADE,
+            page INTEGER NOT NULL,
+            status VARCHAR(20) DEFAULT 'pending',
+            worker_id VARCHAR(255),
+            attempts INTEGER DEFAULT 0,
+            last_error TEXT,
+            heartbeat_at TIMESTAMP,
+            lease_expires_at TIMESTAMP,
+            not_before TIMESTAMP,
+            finished_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # Retry delay column for tables created before it existed
+    cursor.execute("ALTER TABLE scrape_jobs ADD COLUMN IF NOT EXISTS not_before TIMESTAMP")
+
     # Indexes
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_category ON products(category_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_platform ON products(platform_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_price_history_product ON price_history(product_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_price_history_date ON price_history(scraped_at)")
+    # Lets buffered prices be re-synced without duplicating history
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_price_history_product_date
+        ON price_history(product_id, scraped_at)
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_scrape_jobs_status ON scrape_jobs(status, lease_expires_at)")
+    # Only one open job per (query, page) - finished jobs can be re-queued
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_scrape_jobs_open
+        ON scrape_jobs(query_id, page) WHERE status IN ('pending', 'running')
+    """)
 
     conn.commit()
 
@@ -0,0 +1,167 @@
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import SCRAPER_CONFIG
+from database.db import save_product_page, get_category_id, get_platform_id
+
+# Default local buffer file (one per scraper node)
+BUFFER_FILE = Path(__file__).parent.parent / "scrape_buffer.db"
+
+
+class PostgresStorage:
+    """Write scraped pages straight to the central PostgreSQL"""
+
+    def get_category_id(self, slug):
+        """Get category ID by slug"""
+        return get_category_id(slug)
+
+    def get_platform_id(self, name):
+        """Get platform ID by name"""
+        return get_platform_id(name)
+
+    def save_page(self, page):
+        """Save a ProductPage"""
+        save_product_page(page)
+
+
+class SQLiteStorage:
+    """Buffer scraped pages in a local SQLite file until `main.py sync` ships them"""
+
+    def __init__(self, path=None):
+        self.path = str(path or BUFFER_FILE)
+        self._create_table()
+
+    def get_connection(self):
+        """Get buffer connection (WAL so the sync process can read while we write)"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _create_table(self):
+        conn = self.get_connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS buffered_prices (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                category_id INTEGER,
+                platform_id INTEGER,
+                name TEXT NOT NULL,
+                url TEXT NOT NULL,
+                shop_name TEXT,
+                image_url TEXT,
+                price REAL NOT NULL,
+                original_price REAL,
+                discount_percent INTEGER,
+                sold INTEGER,
+                scraped_at TEXT NOT NULL,
+                UNIQUE (url, scraped_at)
+            )
+        """)
+        # Category/platform IDs from PostgreSQL, so the node can start while it's down
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cached_ids (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def _cached_id(self, kind, key, resolve):
+        """Look up an ID in the local cache, resolving it from PostgreSQL the first time"""
+        conn = self.get_connection()
+        row = conn.execute(
+            "SELECT id FROM cached_ids WHERE kind = ? AND key = ?", (kind, key)
+        ).fetchone()
+        if row:
+            conn.close()
+            return row[0]
+
+        result = resolve(key)
+        if result is not None:
+            conn.execute(
+                "INSERT OR REPLACE INTO cached_ids (kind, key, id) VALUES (?, ?, ?)",
+                (kind, key, result)
+            )
+            conn.commit()
+        conn.close()
+        return result
+
+    def get_category_id(self, slug):
+        """Get category ID by slug"""
+        return self._cached_id('category', slug, get_category_id)
+
+    def get_platform_id(self, name):
+        """Get platform ID by name"""
+        return self._cached_id('platform', name, get_platform_id)
+
+    def save_page(self, page):
+        """Save a ProductPage"""
+        scraped_at = page.scraped_at.isoformat()
+
+        conn = self.get_connection()
+        conn.executemany("""
+            INSERT OR IGNORE INTO buffered_prices
+                (category_id, platform_id, name, url, shop_name, image_url,
+                 price, original_price, discount_percent, sold, scraped_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            page.category_id,
+            page.platform_id,
+            p.name,
+            p.url,
+            p.shop_name,
+            p.image_url,
+            p.price,
+            p.original_price,
+            p.discount_percent,
+            p.sold,
+            scraped_at
+        ) for p in page.products])
+        conn.commit()
+        conn.close()
+
+    def get_unsynced(self, limit=1000):
+        """Get the oldest buffered rows, as dicts ready for save_products_batch()"""
+        conn = self.get_connection()
+        rows = conn.execute(
+            "SELECT * FROM buffered_prices ORDER BY id LIMIT ?", (limit,)
+        ).fetchall()
+        conn.close()
+
+        results = []
+        for row in rows:
+            row = dict(row)
+            row['scraped_at'] = datetime.fromisoformat(row['scraped_at'])
+            results.append(row)
+        return results
+
+    def mark_synced(self, ids):
+        """Drop rows that made it to PostgreSQL"""
+        conn = self.get_connection()
+        conn.executemany("DELETE FROM buffered_prices WHERE id = ?", [(i,) for i in ids])
+        conn.commit()
+        conn.close()
+
+    def count(self):
+        """Number of rows waiting to be synced"""
+        conn = self.get_connection()
+        total = conn.execute("SELECT COUNT(*) FROM buffered_prices").fetchone()[0]
+        conn.close()
+        return total
+
+
+def get_storage():
+    """Get the storage backend picked in SCRAPER_CONFIG['storage']"""
+    backend = SCRAPER_CONFIG.get('storage', 'postgres')
+    if backend == 'sqlite':
+        return SQLiteStorage(SCRAPER_CONFIG.get('buffer_path'))
+    if backend == 'postgres':
+        return PostgresStorage()
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -0,0 +1,39 @@
+import time
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.db import save_products_batch
+from database.storage import SQLiteStorage
+
+
+def sync_once(storage, batch_size=1000):
+    """Ship buffered rows to PostgreSQL until the buffer is empty, return rows synced"""
+    total = 0
+    while True:
+        rows = storage.get_unsynced(batch_size)
+        if not rows:
+            return total
+
+        # Safe to resend if we die before mark_synced - the batch write is idempotent
+        save_products_batch(rows)
+        storage.mark_synced([r['id'] for r in rows])
+        total += len(rows)
+        print(f"Synced {total} rows ({storage.count()} left)")
+
+
+def run_sync(buffer_path=None, interval=30, batch_size=1000, once=False):
+    """Keep syncing the local buffer to PostgreSQL, retrying through DB outages"""
+    storage = SQLiteStorage(buffer_path)
+    print(f"Syncing {storage.path} to PostgreSQL every {interval}s")
+
+    while True:
+        try:
+            sync_once(storage, batch_size)
+        except Exception as e:
+            # Rows stay buffered, try again next round
+            print(f"Sync failed: {e}")
+
+        if once:
+            break
+        time.sleep(interval)
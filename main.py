@@ -4,12 +4,15 @@ Scrap-RAM: Hardware Price Tracker for Malaysia
 """
 import argparse
 from scraper.shopee import ShopeeScraper
+from scraper.worker import run_worker
 from database.db import get_all_products
+from database.jobs import get_or_create_search_query, enqueue_jobs, get_job_counts
+from database.sync import run_sync
 
 
 def login(args):
     """Login to Shopee and save session"""
-    scraper = ShopeeScraper()
+    scraper = ShopeeScraper(profile_dir=args.profile)
     scraper.login()
 
 
@@ -21,13 +24,47 @@ def scrape(args):
     print("-" * 40)
 
     scraper = ShopeeScraper(headless=args.headless)
-    products = scraper.search_products(
+    total = 0
+    for page in scraper.iter_products(
         keyword=args.keyword,
         category_slug=args.category,
         max_pages=args.pages
+    ):
+        total += len(page)
+
+    print(f"\nDone! Scraped {total} products.")
+
+
+def enqueue(args):
+    """Queue (keyword, page) jobs for workers"""
+    query_id = get_or_create_search_query(args.keyword, category_slug=args.category)
+    count = enqueue_jobs(query_id, args.pages)
+
+    print(f"Queued {count} new jobs for: {args.keyword}")
+    for status, total in sorted(get_job_counts().items()):
+        print(f"  {status}: {total}")
+
+
+def worker(args):
+    """Run a worker that claims jobs from the queue"""
+    run_worker(
+        worker_id=args.worker_id,
+        headless=args.headless,
+        profile_dir=args.profile,
+        lease_seconds=args.lease,
+        poll_interval=args.poll,
+        exit_when_idle=args.exit_when_idle
     )
 
-    print(f"\nDone! Scraped {len(products)} products.")
+
+def sync(args):
+    """Ship the local SQLite buffer to PostgreSQL"""
+    run_sync(
+        buffer_path=args.buffer,
+        interval=args.interval,
+        batch_size=args.batch_size,
+        once=args.once
+    )
 
 
 def list_products(args):
@@ -56,6 +93,7 @@ def main():
 
     # Login command
     login_parser = subparsers.add_parser('login', help='Login to Shopee and save session')
+    login_parser.add_argument('--profile', default=None, help='Chromium profile folder (default: chromium_data)')
     login_parser.set_defaults(func=login)
 
     # Scrape command
@@ -66,6 +104,31 @@ def main():
     scrape_parser.add_argument('--headless', action='store_true', help='Run browser in headless mode')
     scrape_parser.set_defaults(func=scrape)
 
+    # Enqueue command
+    enqueue_parser = subparsers.add_parser('enqueue', help='Queue scrape jobs for workers')
+    enqueue_parser.add_argument('keyword', help='Search keyword (e.g., "ddr5 ram")')
+    enqueue_parser.add_argument('-c', '--category', default='ram', help='Category slug (ram, gpu, ssd, etc.)')
+    enqueue_parser.add_argument('-p', '--pages', type=int, default=1, help='Number of pages to queue')
+    enqueue_parser.set_defaults(func=enqueue)
+
+    # Worker command
+    worker_parser = subparsers.add_parser('worker', help='Claim and scrape queued jobs')
+    worker_parser.add_argument('--profile', default=None, help='Chromium profile folder (one per worker)')
+    worker_parser.add_argument('--worker-id', default=None, help='Worker name (default: hostname:pid)')
+    worker_parser.add_argument('--lease', type=int, default=120, help='Job lease in seconds before it can be reclaimed')
+    worker_parser.add_argument('--poll', type=int, default=10, help='Seconds to wait when the queue is empty')
+    worker_parser.add_argument('--exit-when-idle', action='store_true', help='Exit once the queue is empty')
+    worker_parser.add_argument('--headless', action='store_true', help='Run browser in headless mode')
+    worker_parser.set_defaults(func=worker)
+
+    # Sync command
+    sync_parser = subparsers.add_parser('sync', help='Sync the local SQLite buffer to PostgreSQL')
+    sync_parser.add_argument('--buffer', default=None, help='SQLite buffer file (default: scrape_buffer.db)')
+    sync_parser.add_argument('--interval', type=int, default=30, help='Seconds between sync rounds')
+    sync_parser.add_argument('--batch-size', type=int, default=1000, help='Rows per PostgreSQL transaction')
+    sync_parser.add_argument('--once', action='store_true', help='Sync once and exit')
+    sync_parser.set_defaults(func=sync)
+
     # List command
     list_parser = subparsers.add_parser('list', help='List saved products')
     list_parser.add_argument('-c', '--category', default=None, help='Filter by category')
@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass
+class Product:
+    """A single scraped listing - page-wide fields live on ProductPage"""
+    __slots__ = (
+        'name', 'url', 'price', 'original_price', 'discount_percent',
+        'sold', 'shop_name', 'image_url'
+    )
+    name: str
+    url: str
+    price: float
+    original_price: float
+    discount_percent: int
+    sold: int
+    shop_name: str
+    image_url: str
+
+
+@dataclass
+class ProductPage:
+    """One search results page worth of products"""
+    __slots__ = ('category_id', 'platform_id', 'page_num', 'scraped_at', 'products')
+    category_id: int
+    platform_id: int
+    page_num: int
+    scraped_at: datetime  # aware, taken when the page HTML was captured
+    products: list
+
+    def __len__(self):
+        return len(self.products)
+
+    def __iter__(self):
+        return iter(self.products)
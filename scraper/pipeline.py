@@ -0,0 +1,65 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import queue
+import threading
+
+
+class ScrapePipeline:
+    """Overlap browser navigation with parsing and DB writes.
+
+    The browser thread hands raw HTML to submit(), which ships it to a
+    process pool for parsing. A writer thread saves parsed pages to the
+    storage backend in order. The pending queue is bounded, so submit()
+    blocks when parsing/writing falls behind instead of piling up pages
+    in memory.
+    Saved pages are handed back through drain().
+    """
+
+    def __init__(self, parse_fn, storage, workers=2, max_pending=4):
+        self.parse_fn = parse_fn
+        self.storage = storage
+        # Spawn, not fork - forked workers would inherit Playwright's driver
+        # pipes and the writer thread, and hang the browser on exit
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.saved = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, name="db-writer")
+        self.writer.start()
+
+    def submit(self, page_num, *args):
+        """Queue a page for parsing (blocks while the pipeline is full)"""
+        future = self.executor.submit(self.parse_fn, *args, page_num=page_num)
+        self.pending.put((page_num, future))
+
+    def drain(self):
+        """Yield pages saved so far without waiting for the rest"""
+        while True:
+            try:
+                yield self.saved.get_nowait()
+            except queue.Empty:
+                return
+
+    def close(self):
+        """Wait for queued pages to be parsed and saved"""
+        self.pending.put(None)
+        self.writer.join()
+        self.executor.shutdown()
+
+    def _write_loop(self):
+        """Save parsed pages, one transaction per page"""
+        while True:
+            job = self.pending.get()
+            if job is None:
+                break
+
+            page_num, future = job
+            try:
+                page = future.result()
+                self.storage.save_page(page)
+                self.saved.put(page)
+                print(f"Saved {len(page)} products from page {page_num + 1}")
+            except Exception as e:
+                print(f"Error saving page {page_num + 1}: {e}")
@@ -1,25 +1,53 @@
 from playwright.sync_api import sync_playwright
 from undetected_playwright import stealth_sync
 from bs4 import BeautifulSoup
+from contextlib import contextmanager
 import time
 import re
+from datetime import datetime, timezone
 import sys
 import os
 from pathlib import Path
+from urllib.parse import quote_plus
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import SCRAPER_CONFIG, CHROME_CONFIG
-from database.db import get_category_id, get_platform_id, save_product, save_price
+from database.storage import get_storage
+from scraper.models import Product, ProductPage
+from scraper.pipeline import ScrapePipeline
 
 # Session file path
 SESSION_FILE = Path(__file__).parent.parent / "shopee_session.json"
 
+# Default Chromium profile folder (one per worker/node)
+CHROMIUM_PROFILE = Path(__file__).parent.parent / "chromium_data"
+
+
+class CaptchaError(Exception):
+    """Shopee showed a CAPTCHA and nobody is there to solve it"""
+
+
+def capture_time():
+    """Current time, timezone-aware.
+
+    PostgreSQL converts it into the session's zone when writing to the
+    TIMESTAMP columns, the same zone CURRENT_TIMESTAMP uses, so rows from
+    every node and from before this change sort together.
+    """
+    return datetime.now(timezone.utc)
+
 
 class ShopeeScraper:
-    def __init__(self, headless=None):
+    def __init__(self, headless=None, profile_dir=None, interactive=True):
         self.headless = headless if headless is not None else SCRAPER_CONFIG['headless']
+        # Unattended workers raise CaptchaError instead of prompting on stdin
+        self.interactive = interactive
+        self.profile_dir = str(profile_dir or CHROMIUM_PROFILE)
         self.delay = SCRAPER_CONFIG['delay_between_requests']
-        self.platform_id = get_platform_id('Shopee')
+        self.parse_workers = SCRAPER_CONFIG.get('parse_workers', 2)
+        self.max_pending_pages = SCRAPER_CONFIG.get('max_pending_pages', 4)
+        self.storage = get_storage()
+        self.platform_id = self.storage.get_platform_id('Shopee')
         self.base_url = "https://shopee.com.my"
 
     def login(self):
@@ -30,11 +58,9 @@ class ShopeeScraper:
         print("  2. Once logged in, press ENTER here")
         print("-" * 40)
 
-        chromium_profile = str(Path(__file__).parent.parent / "chromium_data")
-
         with sync_playwright() as p:
             context = p.chromium.launch_persistent_context(
-                user_data_dir=chromium_profile,
+                user_data_dir=self.profile_dir,
                 headless=False,
                 viewport={'width': 1920, 'height': 1080},
                 args=[
@@ -60,19 +86,94 @@ class ShopeeScraper:
         return SESSION_FILE.exists()
 
     def search_products(self, keyword, category_slug='ram', max_pages=1):
-        """Search for products using your Chrome profile"""
+        """Search for products and return them all as one list"""
+        return [
+            product
+            for page in self.iter_products(keyword, category_slug, max_pages)
+            for product in page
+        ]
+
+    def iter_products(self, keyword, category_slug='ram', max_pages=1):
+        """Search for products using your Chrome profile, yielding each ProductPage once saved"""
+        category_id = self.storage.get_category_id(category_slug)
+
+        # Parse and save pages in the background while the browser moves on
+        pipeline = ScrapePipeline(
+            self._parse_search_results,
+            self.storage,
+            workers=self.parse_workers,
+            max_pending=self.max_pending_pages
+        )
+
+        try:
+            with self.open_browser() as page:
+                # Use search bar (human-like behavior)
+                print(f"Searching for: {keyword}")
+                search_box = page.locator('.shopee-searchbar-input__input').first
+                search_box.click()
+                time.sleep(0.5)
+
+                # Type slowly like human
+                for char in keyword:
+                    search_box.type(char, delay=50)
+
+                time.sleep(0.5)
+                page.keyboard.press("Enter")
+                print("Search submitted!")
+
+                # Wait for results to load
+                time.sleep(3)
+
+                for page_num in range(max_pages):
+                    if page_num > 0:
+                        # For page 2+, click next or navigate
+                        self._goto_search_page(page, keyword, page_num)
+
+                    print(f"Scraping page {page_num + 1}...")
+
+                    try:
+                        # Hand page content off for parsing
+                        html = self._capture_results(page)
+                        pipeline.submit(page_num, html, category_id, capture_time())
+
+                        print(f"Captured page {page_num + 1}")
+
+                        time.sleep(self.delay)
+
+                        # Hand back whatever finished while we were browsing
+                        yield from pipeline.drain()
+
+                    except Exception as e:
+                        print(f"Error scraping page {page_num + 1}: {e}")
+                        page.screenshot(path=f"error_page_{page_num}.png")
+        finally:
+            # Wait for pages still being parsed/saved
+            pipeline.close()
+
+        yield from pipeline.drain()
+
+    def scrape_page(self, page, keyword, page_num, category_id):
+        """Scrape and save a single search results page, return the ProductPage"""
+        self._goto_search_page(page, keyword, page_num)
+        print(f"Scraping '{keyword}' page {page_num + 1}...")
+
+        html = self._capture_results(page)
+        results = self._parse_search_results(html, category_id, capture_time(), page_num=page_num)
+        self.storage.save_page(results)
+
+        print(f"Saved {len(results)} products from page {page_num + 1}")
+        time.sleep(self.delay)
+        return results
+
+    @contextmanager
+    def open_browser(self):
+        """Launch Chromium with stealth, warm up on the homepage and yield the page"""
         print("CLOSE Chrome first if it's runningasdas!")
         print("-" * 40)
 
-        category_id = get_category_id(category_slug)
-        all_products = []
-
         with sync_playwright() as p:
-            # Use Chromium with separate profile folder
-            chromium_profile = str(Path(__file__).parent.parent / "chromium_data")
-
             context = p.chromium.launch_persistent_context(
-                user_data_dir=chromium_profile,
+                user_data_dir=self.profile_dir,
                 headless=self.headless,
                 viewport={'width': 1920, 'height': 1080},
                 args=[
@@ -97,73 +198,48 @@ class ShopeeScraper:
             # Check for CAPTCHA on homepage
             if "verify/captcha" in page.url or "verify/traffic" in page.url:
                 print("\n*** CAPTCHA DETECTED! ***")
+                if not self.interactive:
+                    raise CaptchaError(page.url)
                 print("Please solve the CAPTCHA in the browser...")
                 input("Press ENTER after solving CAPTCHA...")
                 page.goto(self.base_url, wait_until="domcontentloaded", timeout=60000)
 
             print(f"Homepage loaded! URL: {page.url}")
 
-            # Use search bar (human-like behavior)
-            print(f"Searching for: {keyword}")
-            search_box = page.locator('.shopee-searchbar-input__input').first
-            search_box.click()
-            time.sleep(0.5)
-
-            # Type slowly like human
-            for char in keyword:
-                search_box.type(char, delay=50)
-
+            try:
+                yield page
+            finally:
+                context.close()
+
+    def _goto_search_page(self, page, keyword, page_num):
+        """Navigate straight to a search results page"""
+        search_url = f"{self.base_url}/search?keyword={quote_plus(keyword)}&page={page_num}"
+        page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
+        time.sleep(2)
+
+    def _capture_results(self, page):
+        """Wait for search results to render and return the page HTML"""
+        # Check for CAPTCHA
+        if "verify/captcha" in page.url or "verify/traffic" in page.url:
+            print("\n*** CAPTCHA DETECTED! ***")
+            if not self.interactive:
+                raise CaptchaError(page.url)
+            input("Solve CAPTCHA, then press ENTER...")
+
+        # Wait for products to load
+        page.wait_for_selector('.shopee-search-item-result__item', timeout=30000)
+
+        # Scroll to load more products
+        for _ in range(3):
+            page.mouse.wheel(0, 1000)
             time.sleep(0.5)
-            page.keyboard.press("Enter")
-            print("Search submitted!")
-
-            # Wait for results to load
-            time.sleep(3)
-
-            for page_num in range(max_pages):
-                if page_num > 0:
-                    # For page 2+, click next or navigate
-                    search_url = f"{self.base_url}/search?keyword={keyword}&page={page_num}"
-                    page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
-                    time.sleep(2)
 
-                print(f"Scraping page {page_num + 1}...")
-
-                try:
-                    # Check for CAPTCHA
-                    if "verify/captcha" in page.url or "verify/traffic" in page.url:
-                        print("\n*** CAPTCHA DETECTED! ***")
-                        input("Solve CAPTCHA, then press ENTER...")
-
-                    # Wait for products to load
-                    page.wait_for_selector('.shopee-search-item-result__item', timeout=30000)
-
-                    # Scroll to load more products
-                    for _ in range(3):
-                        page.mouse.wheel(0, 1000)
-                        time.sleep(0.5)
-
-                    time.sleep(2)  # Wait for lazy-loaded content
-
-                    # Get page content
-                    html = page.content()
-                    products = self._parse_search_results(html, category_id)
-                    all_products.extend(products)
-
-                    print(f"Found {len(products)} products on page {page_num + 1}")
-
-                    time.sleep(self.delay)
-
-                except Exception as e:
-                    print(f"Error scraping page {page_num + 1}: {e}")
-                    page.screenshot(path=f"error_page_{page_num}.png")
-
-            context.close()
+        time.sleep(2)  # Wait for lazy-loaded content
 
-        return all_products
+        return page.content()
 
-    def _parse_search_results(self, html, category_id):
-        """Parse search results HTML and extract product data"""
+    def _parse_search_results(self, html, category_id, scraped_at, page_num=0):
+        """Parse search results HTML into a ProductPage (runs in a worker process)"""
         soup = BeautifulSoup(html, 'html.parser')
         products = []
 
@@ -172,24 +248,16 @@ class ShopeeScraper:
 
         for item in items:
             try:
-                product_data = self._extract_product_data(item, category_id)
-                if product_data:
-                    # Save to database
-                    product_id = save_product(product_data)
-                    save_price(product_id, {
-                        'price': product_data['price'],
-                        'original_price': product_data.get('original_price'),
-                        'discount_percent': product_data.get('discount_percent'),
-                        'sold': product_data.get('sold')
-                    })
-                    products.append(product_data)
+                product = self._extract_product_data(item)
+                if product:
+                    products.append(product)
             except Exception as e:
                 print(f"Error extracting product: {e}")
                 continue
 
-        return products
+        return ProductPage(category_id, self.platform_id, page_num, scraped_at, products)
 
-    def _extract_product_data(self, item, category_id):
+    def _extract_product_data(self, item):
         """Extract product data from a single item element"""
         # Get product link
         link_elem = item.select_one('a[href*="-i."]')
@@ -245,19 +313,16 @@ class ShopeeScraper:
         if img_elem:
             image_url = img_elem.get('src') or img_elem.get('data-src')
 
-        return {
-            'category_id': category_id,
-            'platform_id': self.platform_id,
-            'name': name,
-            'url': url,
-            'price': price,
-            'original_price': original_price,
-            'discount_percent': discount_percent,
-            'sold': sold,
-            'shop_name': shop_name,
-            'image_url': image_url,
-            'specs': {}
-        }
+        return Product(
+            name=name,
+            url=url,
+            price=price,
+            original_price=original_price,
+            discount_percent=discount_percent,
+            sold=sold,
+            shop_name=shop_name,
+            image_url=image_url
+        )
 
     def _parse_price(self, price_text):
         """Parse price text to float (handles RM, commas, ranges)"""
@@ -298,9 +363,9 @@ if __name__ == "__main__":
     print(f"{'='*50}")
 
     for p in products[:5]:  # Show first 5
-        print(f"\n{p['name'][:50]}...")
-        print(f"  Price: RM{p['price']}")
-        if p['original_price']:
-            print(f"  Original: RM{p['original_price']} ({p['discount_percent']}% off)")
-        if p['sold']:
-            print(f"  Sold: {p['sold']}")
+        print(f"\n{p.name[:50]}...")
+        print(f"  Price: RM{p.price}")
+        if p.original_price:
+            print(f"  Original: RM{p.original_price} ({p.discount_percent}% off)")
+        if p.sold:
+            print(f"  Sold: {p.sold}")
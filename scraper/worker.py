@@ -0,0 +1,142 @@
+import psycopg2
+import sqlite3
+import os
+import socket
+import threading
+import time
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.jobs import claim_job, heartbeat_job, complete_job, fail_job, release_job
+from scraper.shopee import ShopeeScraper, CaptchaError
+
+
+class JobHeartbeat:
+    """Keep a claimed job's lease alive from a background thread"""
+
+    def __init__(self, job_id, worker_id, lease_seconds):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="job-heartbeat", daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+
+    def _run(self):
+        # Renew well before expiry so one slow heartbeat doesn't lose the lease
+        while not self.stopped.wait(self.lease_seconds / 3):
+            try:
+                if not heartbeat_job(self.job_id, self.worker_id, self.lease_seconds):
+                    print(f"Lost lease on job {self.job_id}")
+                    return
+            except Exception as e:
+                print(f"Heartbeat failed for job {self.job_id}: {e}")
+
+
+def default_worker_id():
+    """Worker ID unique per process, e.g. 'node-1:4242'"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# Connection-level failures worth waiting out - anything else is a bug or missing schema
+DB_DOWN_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+# Failures saving a scraped page - the node's problem, not the page's
+STORAGE_ERRORS = DB_DOWN_ERRORS + (sqlite3.OperationalError,)
+
+
+def retry(fn, *args):
+    """Call a queue function, retrying with backoff while the DB is unreachable"""
+    delay = 1
+    while True:
+        try:
+            return fn(*args)
+        except DB_DOWN_ERRORS as e:
+            print(f"{fn.__name__} failed: {e} - retrying in {delay}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 60)
+
+
+def browser_alive(page):
+    """Check the browser is still answering"""
+    try:
+        return not page.is_closed() and page.evaluate("1") == 1
+    except Exception:
+        return False
+
+
+def run_worker(worker_id=None, headless=None, profile_dir=None, lease_seconds=120,
+               poll_interval=10, max_attempts=3, exit_when_idle=False):
+    """Claim and scrape jobs from the queue until stopped"""
+    worker_id = worker_id or default_worker_id()
+    scraper = ShopeeScraper(headless=headless, profile_dir=profile_dir, interactive=False)
+    print(f"Worker {worker_id} starting (profile: {scraper.profile_dir})")
+
+    delay = 1
+    while True:
+        try:
+            with scraper.open_browser() as page:
+                delay = 1
+                if _work_jobs(scraper, page, worker_id, lease_seconds, poll_interval,
+                              max_attempts, exit_when_idle):
+                    return
+        except psycopg2.Error:
+            # retry() already waited out outages - this won't fix itself
+            raise
+        except Exception as e:
+            print(f"Browser error: {e}")
+
+        print(f"Reopening browser in {delay}s...")
+        time.sleep(delay)
+        delay = min(delay * 2, 60)
+
+
+def _work_jobs(scraper, page, worker_id, lease_seconds, poll_interval, max_attempts,
+               exit_when_idle):
+    """Process jobs with an open browser. Return True when idle, False if the browser died."""
+    backoff = poll_interval
+    while True:
+        job = retry(claim_job, worker_id, lease_seconds, max_attempts)
+
+        if not job:
+            if exit_when_idle:
+                print("No jobs left, exiting.")
+                return True
+            time.sleep(poll_interval)
+            continue
+
+        print(f"Claimed job {job['id']}: '{job['keyword']}' page {job['page'] + 1} "
+              f"(attempt {job['attempts']})")
+
+        try:
+            with JobHeartbeat(job['id'], worker_id, lease_seconds):
+                scraper.scrape_page(page, job['keyword'], job['page'], job['category_id'])
+        except (CaptchaError, *STORAGE_ERRORS) as e:
+            # Blocked or storage down - not the page's fault, so hand it back
+            # without using an attempt and give things time to recover
+            reason = "CAPTCHA" if isinstance(e, CaptchaError) else f"storage error ({e})"
+            retry(release_job, job['id'], worker_id, reason)
+            print(f"{reason} on job {job['id']}, backing off {backoff}s")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 600)
+            continue
+        except Exception as e:
+            print(f"Error on job {job['id']}: {e}")
+            if not browser_alive(page):
+                # Not the page's fault - hand it back without burning an attempt
+                retry(release_job, job['id'], worker_id)
+                return False
+            retry(fail_job, job['id'], worker_id, str(e), max_attempts)
+            continue
+
+        backoff = poll_interval
+        if not retry(complete_job, job['id'], worker_id):
+            print(f"Job {job['id']} was reclaimed by another worker")